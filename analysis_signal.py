@@ -3,15 +3,27 @@ Market Sentiment Signal Generation with TF-IDF and Keyword Analysis
 Transforms textual tweet data into quantitative trading signals
 """
 
+import os
+import sys
 import json
-import math
 from pathlib import Path
 from datetime import datetime, timezone
 
 import numpy as np
 import pandas as pd
+import pyarrow.dataset as ds
+import matplotlib
+
+# No display to show the figure on: skip GUI backend start-up and render with Agg
+HEADLESS = sys.platform.startswith("linux") and not (
+    os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY")
+)
+if HEADLESS:
+    matplotlib.use("Agg")
+
 import matplotlib.pyplot as plt
-from sklearn.feature_extraction.text import TfidfVectorizer
+from joblib import Parallel, delayed
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
 from sklearn.decomposition import TruncatedSVD
 from sklearn.preprocessing import StandardScaler
 
@@ -19,58 +31,87 @@ from sklearn.preprocessing import StandardScaler
 PARQUET_DIR = "data/processed_parquet"
 OUTPUT_DIR = Path("data/signals")
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-
-BULLISH = {
+N_JOBS = max(1, (os.cpu_count() or 1) - 1)
+# Vocabulary pruning TfidfVectorizer used to do, applied to the hashed columns
+TFIDF_MAX_FEATURES = 200
+TFIDF_MIN_DF = 2
+TFIDF_MAX_DF = 0.7
+
+HASHER = HashingVectorizer(
+    n_features=2**14,
+    ngram_range=(1, 2),
+    stop_words="english",
+    alternate_sign=False,
+    norm=None,
+)
+
+BULLISH = frozenset({
     "buy", "bull", "bullish", "breakout", "long", "support", "target", "rally",
     "profit", "gain", "moon", "rocket", "accumulate", "hold", "bounce",
     "teji", "badhat", "kharido", "munafa", "uchaal", "paisa banega", 
     "तेज़ी", "खरीदो", "मुनाफा", "बढ़त", "ऊपर जाएगा"
-}
+})
 
-BEARISH = {
+BEARISH = frozenset({
     "sell", "bear", "bearish", "short", "breakdown", "resistance", "downside",
     "crash", "dump", "panic", "drop", "loss", "exit", "correction",
     "mandi", "girawat", "becho", "nuksan", "jahar", "bahar nikal jao", "trap",
     "मंदी", "गिरावट", "बेचो", "जहर", "बर्बाद", "धड़ाम"
-}
-
-
-def tokenize(text: str) -> set:
-    if not text:
-        return set()
-    return {t.strip(".,!?:;()[]{}\"'").lower() for t in text.split() if len(t) > 1}
-
-
-def keyword_sentiment(text: str) -> int:
-    if not text:
-        return 0
-    
-    text_lower = text.lower()
-    score = 0
-    
-    for term in BULLISH:
-        if term in text_lower:
-            score += 1
-            
-    for term in BEARISH:
-        if term in text_lower:
-            score -= 1
-            
-    if score > 0: return 1
-    if score < 0: return -1
-    return 0
-
-
-def engagement_weight(row) -> float:
-    raw = (
-        row["like_count"] * 1.0 + row["retweet_count"] * 2.0 + row["reply_count"] * 0.5
-    )
-    return math.log1p(max(raw, 0.0))
+})
+
+
+ENGAGEMENT_COLS = ["like_count", "retweet_count", "reply_count"]
+LOAD_COLUMNS = ["timestamp_utc", "content", *ENGAGEMENT_COLS]
+SUMMARY_COLUMNS = [
+    f"{name}_{stat}"
+    for name in ("keyword", "tfidf", "combined")
+    for stat in ("signal", "ci_low", "ci_high")
+]
+ENGAGEMENT_MULTIPLIERS = np.array([1.0, 2.0, 0.5], dtype=np.float32)
+
+
+def keyword_hits(text_lower: pd.Series, terms) -> np.ndarray:
+    # How many of the terms occur anywhere in each text (plain substring test,
+    # so "bullish" scores for both "bull" and "bullish")
+    hits = np.zeros(len(text_lower), dtype=np.int16)
+    for term in terms:
+        hits += text_lower.str.contains(term, regex=False).to_numpy(dtype=bool)
+    return hits
+
+
+def keyword_sentiment(content: pd.Series) -> np.ndarray:
+    # Scan each distinct text once; retweets and copy-paste spam repeat a lot.
+    # One vectorized substring pass per term, then the sign of bull - bear hits.
+    codes, uniques = pd.factorize(content.fillna("").str.lower())
+    text_lower = pd.Series(uniques, dtype=object)
+    score = keyword_hits(text_lower, BULLISH) - keyword_hits(text_lower, BEARISH)
+    return np.sign(score).astype(np.int8)[codes]
+
+
+def engagement_weights(df: pd.DataFrame) -> np.ndarray:
+    counts = df[ENGAGEMENT_COLS].to_numpy(dtype=np.float32)
+    weight = counts @ ENGAGEMENT_MULTIPLIERS
+    np.maximum(weight, 0, out=weight)
+    return np.log1p(weight, out=weight)
 
 
-def keyword_signal(row) -> float:
-    base = keyword_sentiment(row["content"])
-    return base * engagement_weight(row) if base != 0 else 0.0
+def keyword_signal(content: pd.Series, eng: np.ndarray) -> np.ndarray:
+    direction = keyword_sentiment(content)
+    return np.where(direction != 0, direction * eng, np.float32(0))
+
+
+def prune_features(counts):
+    # Drop hashed terms in fewer than TFIDF_MIN_DF or more than TFIDF_MAX_DF of
+    # the documents, then keep the TFIDF_MAX_FEATURES most frequent ones
+    doc_freq = np.asarray((counts > 0).sum(axis=0)).ravel()
+    term_freq = np.asarray(counts.sum(axis=0)).ravel()
+    keep = (doc_freq >= TFIDF_MIN_DF) & (doc_freq <= TFIDF_MAX_DF * counts.shape[0])
+    cols = np.flatnonzero(keep)
+    if len(cols) > TFIDF_MAX_FEATURES:
+        cols = np.sort(cols[np.argsort(-term_freq[cols], kind="stable")[:TFIDF_MAX_FEATURES]])
+    if len(cols) == 0:
+        raise ValueError("After pruning, no terms remain")
+    return counts[:, cols]
 
 
 def compute_tfidf_sentiment(df: pd.DataFrame) -> np.ndarray:
@@ -78,15 +119,9 @@ def compute_tfidf_sentiment(df: pd.DataFrame) -> np.ndarray:
         return np.zeros(len(df))
 
     try:
-        vectorizer = TfidfVectorizer(
-            max_features=200,
-            min_df=2,
-            max_df=0.7,
-            stop_words="english",
-            ngram_range=(1, 2),
-            sublinear_tf=True,
-        )
-        tfidf_matrix = vectorizer.fit_transform(df["content"].fillna(""))
+        content = df["content"].fillna("")
+        counts = prune_features(HASHER.transform(content))
+        tfidf_matrix = TfidfTransformer(sublinear_tf=True).fit_transform(counts)
 
         svd = TruncatedSVD(n_components=1, random_state=42)
         sentiment_raw = svd.fit_transform(tfidf_matrix).flatten()
@@ -98,25 +133,37 @@ def compute_tfidf_sentiment(df: pd.DataFrame) -> np.ndarray:
         return np.zeros(len(df))
 
 
-def combined_signal(row, tfidf_score: float) -> float:
-    kw = keyword_signal(row)
-    eng = engagement_weight(row)
-    return (0.6 * kw) + (0.4 * tfidf_score * eng)
+def combined_signal(kw: np.ndarray, tfidf: np.ndarray, eng: np.ndarray) -> np.ndarray:
+    # Accumulate into one float32 buffer rather than allocating a temporary per operator
+    out = np.multiply(tfidf, eng, dtype=np.float32)
+    out *= np.float32(0.4)
+    out += np.multiply(kw, np.float32(0.6), dtype=np.float32)
+    return out
+
+
+BOOTSTRAP_MAX_CELLS = 10_000_000
 
 
 def bootstrap_ci(values: np.ndarray, n=1000, alpha=0.05):
-    if len(values) == 0:
+    m = len(values)
+    if m == 0:
         return 0.0, (0.0, 0.0)
 
     rng = np.random.default_rng(42)
-    means = [
-        rng.choice(values, size=len(values), replace=True).mean() for _ in range(n)
-    ]
+    # Resample in row batches so the (n, m) index matrix stays bounded
+    batch = max(1, BOOTSTRAP_MAX_CELLS // m)
+    means = np.empty(n, dtype=np.float64)
+    for start in range(0, n, batch):
+        stop = min(start + batch, n)
+        idx = rng.integers(0, m, size=(stop - start, m), dtype=np.int32)
+        means[start:stop] = values.take(idx).mean(axis=1, dtype=np.float64)
 
-    return float(np.mean(values)), (
-        float(np.percentile(means, alpha / 2 * 100)),
-        float(np.percentile(means, (1 - alpha / 2) * 100)),
-    )
+    low, high = np.percentile(means, [alpha / 2 * 100, (1 - alpha / 2) * 100])
+    return float(values.mean()), (float(low), float(high))
+
+
+def hour_stats(kw_arr: np.ndarray, tf_arr: np.ndarray, cb_arr: np.ndarray):
+    return bootstrap_ci(kw_arr), bootstrap_ci(tf_arr), bootstrap_ci(cb_arr)
 
 
 def main():
@@ -125,13 +172,18 @@ def main():
     print("=" * 60)
 
     # Load data
-    parquet_files = list(Path(PARQUET_DIR).rglob("tweets.parquet"))
-    if not parquet_files:
+    dataset = ds.dataset(PARQUET_DIR, format="parquet") if Path(PARQUET_DIR).is_dir() else None
+    if dataset is None or not dataset.files:
         print(f"ERROR: No parquet files in {PARQUET_DIR}")
         return
 
-    df = pd.concat([pd.read_parquet(p) for p in parquet_files], ignore_index=True)
-    print(f"\nLoaded {len(df)} tweets from {len(parquet_files)} partitions")
+    # One multi-threaded scan over every partition, only the columns we use
+    table = dataset.to_table(columns=LOAD_COLUMNS, use_threads=True)
+    df = table.to_pandas(types_mapper=pd.ArrowDtype, self_destruct=True)
+    del table
+    # Counts never approach 2**31; narrower columns halve the engagement kernel's traffic
+    df[ENGAGEMENT_COLS] = df[ENGAGEMENT_COLS].astype(np.int32)
+    print(f"\nLoaded {len(df)} tweets from {len(dataset.files)} partitions")
 
     # Parse timestamps
     df["ts"] = pd.to_datetime(df["timestamp_utc"], utc=True, errors="coerce")
@@ -139,14 +191,15 @@ def main():
 
     # Compute signals
     print("Computing keyword signals...")
-    df["keyword_signal"] = df.apply(keyword_signal, axis=1)
+    eng = engagement_weights(df)
+    df["keyword_signal"] = keyword_signal(df["content"], eng)
 
     print("Computing TF-IDF signals...")
     df["tfidf_sentiment"] = compute_tfidf_sentiment(df)
 
     print("Computing combined signals...")
-    df["combined_signal"] = df.apply(
-        lambda r: combined_signal(r, r["tfidf_sentiment"]), axis=1
+    df["combined_signal"] = combined_signal(
+        df["keyword_signal"].to_numpy(), df["tfidf_sentiment"].to_numpy(), eng
     )
 
     # Hourly aggregation
@@ -155,48 +208,37 @@ def main():
         print("ERROR: DataFrame is empty after processing. Check your input parquet files.")
         return
 
-    hourly = (
-        df.set_index("ts")
-        .resample("1H")
-        .agg({
-            "keyword_signal": list,
-            "tfidf_sentiment": list,
-            "combined_signal": list
-        })
-        .reset_index()
+    # Sort once so every hour is a contiguous slice of the signal arrays
+    df = df.sort_values("ts", kind="stable")
+    hours = df["ts"].dt.tz_localize(None).to_numpy("datetime64[h]")
+    bucket_hours, starts = np.unique(hours, return_index=True)
+    ends = np.append(starts[1:], len(df))
+
+    kw = df["keyword_signal"].to_numpy(dtype=np.float64)
+    tf = df["tfidf_sentiment"].to_numpy(dtype=np.float64)
+    cb = df["combined_signal"].to_numpy(dtype=np.float64)
+    buckets = [(kw[s:e], tf[s:e], cb[s:e]) for s, e in zip(starts, ends)]
+    bucket_times = pd.to_datetime(bucket_hours, utc=True)
+
+    stats = Parallel(n_jobs=N_JOBS, prefer="processes")(
+        delayed(hour_stats)(*arrays) for arrays in buckets
     )
 
-    # Optional: Filter out hours with 0 tweets to avoid bootstrap errors
-    hourly = hourly[hourly["combined_signal"].map(len) > 0]
-
-    records = []
-    for _, row in hourly.iterrows():
-        kw_mean, kw_ci = bootstrap_ci(np.array(row["keyword_signal"]))
-        tfidf_mean, tfidf_ci = bootstrap_ci(np.array(row["tfidf_sentiment"]))
-        comb_mean, comb_ci = bootstrap_ci(np.array(row["combined_signal"]))
-
-        records.append(
-            {
-                "time": row["ts"],
-                "keyword_signal": kw_mean,
-                "keyword_ci_low": kw_ci[0],
-                "keyword_ci_high": kw_ci[1],
-                "tfidf_signal": tfidf_mean,
-                "tfidf_ci_low": tfidf_ci[0],
-                "tfidf_ci_high": tfidf_ci[1],
-                "combined_signal": comb_mean,
-                "combined_ci_low": comb_ci[0],
-                "combined_ci_high": comb_ci[1],
-                "tweet_count": len(row["combined_signal"]),
-            }
-        )
+    # One row per hour, (mean, ci_low, ci_high) for each of the three signals
+    summary = np.empty((len(stats), len(SUMMARY_COLUMNS)))
+    for i, hour in enumerate(stats):
+        summary[i] = [v for mean, (low, high) in hour for v in (mean, low, high)]
 
-    signals = pd.DataFrame(records)
+    signals = pd.DataFrame(summary, columns=SUMMARY_COLUMNS)
+    signals.insert(0, "time", bucket_times)
+    signals["tweet_count"] = ends - starts
 
-    # Save
+    # Save (parquet is the primary output; CSV kept as-is for existing consumers)
+    output_parquet = OUTPUT_DIR / "hourly_signals.parquet"
+    signals.to_parquet(output_parquet, index=False, compression="zstd")
     output_csv = OUTPUT_DIR / "hourly_signals.csv"
     signals.to_csv(output_csv, index=False)
-    print(f"\n Saved: {output_csv}")
+    print(f"\n Saved: {output_parquet}, {output_csv}")
     print(f"\nSignals:\n{signals}")
 
     # Visualize
@@ -243,7 +285,10 @@ def main():
     plot_path = OUTPUT_DIR / "signals.png"
     plt.savefig(plot_path, dpi=150, bbox_inches="tight")
     print(f" Plot: {plot_path}")
-    plt.show()
+    if HEADLESS:
+        plt.close(fig)
+    else:
+        plt.show()
 
     print(
         f"\n{'='*60}\nComplete Processed {len(df)} tweets {len(signals)} hourly signals\n{'='*60}"
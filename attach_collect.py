@@ -2,11 +2,13 @@ import time, random, re
 from pathlib import Path
 import pandas as pd
 from selenium import webdriver
-from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
 
 OUT_CSV = "data/raw/tweets_sample.csv"
 QUERY = "(%23nifty50%20OR%20%23sensex%20OR%20%23intraday%20OR%20%23banknifty)"
+HASHTAG_RE = re.compile(r"#\w+")
+MENTION_RE = re.compile(r"@\w+")
+COUNT_MULTIPLIERS = {"K": 1000, "M": 1_000_000}
 
 def human_sleep(a=0.8, b=1.6):
     time.sleep(random.uniform(a, b))
@@ -21,58 +23,46 @@ def parse_count(s: str) -> int:
     s = (s or "").replace(",", "").strip()
     if not s:
         return 0
-    mult = 1
-    if s.endswith("K"):
-        mult = 1000; s = s[:-1]
-    elif s.endswith("M"):
-        mult = 1_000_000; s = s[:-1]
+    mult = COUNT_MULTIPLIERS.get(s[-1], 1)
     try:
-        return int(float(s) * mult)
+        return int(float(s[:-1] if mult > 1 else s) * mult)
     except:
         return 0
 
-def safe_find_text(parent, css):
-    try: return parent.find_element(By.CSS_SELECTOR, css).text.strip()
-    except: return ""
-
-def safe_find_attr(parent, css, attr):
-    try: return parent.find_element(By.CSS_SELECTOR, css).get_attribute(attr) or ""
-    except: return ""
-
-def extract_one_article(article):
-    ts = safe_find_attr(article, "time", "datetime")
-    content = safe_find_text(article, '[data-testid="tweetText"]')
-
-    username, handle = "", ""
-    try:
-        spans = article.find_elements(By.CSS_SELECTOR, "span")
-        for sp in spans:
-            t = (sp.text or "").strip()
-            if t.startswith("@"):
-                handle = t
-                break
-        if spans:
-            username = (spans[0].text or "").strip()
-    except:
-        pass
-
-    tweet_url, tweet_id = "", ""
-    try:
-        for a in article.find_elements(By.CSS_SELECTOR, "a"):
-            href = a.get_attribute("href") or ""
-            if "/status/" in href:
-                tweet_url = href
-                tweet_id = href.split("/status/")[-1].split("?")[0]
-                break
-    except:
-        pass
-
-    reply_count = parse_count(safe_find_text(article, '[data-testid="reply"]'))
-    retweet_count = parse_count(safe_find_text(article, '[data-testid="retweet"]'))
-    like_count = parse_count(safe_find_text(article, '[data-testid="like"]'))
-
-    hashtags = re.findall(r"#\w+", content)
-    mentions = re.findall(r"@\w+", content)
+# Pull every article's fields in one round-trip instead of ~10 find_element calls each
+EXTRACT_JS = """
+return Array.from(document.querySelectorAll('article'), a => {
+    const text = sel => (a.querySelector(sel)?.innerText || '').trim();
+    const spans = Array.from(a.querySelectorAll('span'), sp => (sp.innerText || '').trim());
+    const links = Array.from(a.querySelectorAll('a'), x => x.href || '');
+    return {
+        ts: a.querySelector('time')?.dateTime || '',
+        content: text('[data-testid="tweetText"]'),
+        username: spans[0] || '',
+        handle: spans.find(t => t.startsWith('@')) || '',
+        url: links.find(h => h.includes('/status/')) || '',
+        reply: text('[data-testid="reply"]'),
+        retweet: text('[data-testid="retweet"]'),
+        like: text('[data-testid="like"]'),
+    };
+});
+"""
+
+def extract_one_article(raw):
+    ts = raw.get("ts") or ""
+    content = raw.get("content") or ""
+    username = raw.get("username") or ""
+    handle = raw.get("handle") or ""
+
+    tweet_url = raw.get("url") or ""
+    tweet_id = tweet_url.split("/status/")[-1].split("?")[0] if tweet_url else ""
+
+    reply_count = parse_count(raw.get("reply"))
+    retweet_count = parse_count(raw.get("retweet"))
+    like_count = parse_count(raw.get("like"))
+
+    hashtags = HASHTAG_RE.findall(content)
+    mentions = MENTION_RE.findall(content)
 
     if not content and not tweet_url:
         return None
@@ -99,8 +89,8 @@ def collect(driver, limit=50):
 
     scrolls = 0
     while len(rows) < limit and scrolls < 120:
-        for art in driver.find_elements(By.CSS_SELECTOR, "article"):
-            data = extract_one_article(art)
+        for raw in driver.execute_script(EXTRACT_JS):
+            data = extract_one_article(raw)
             if not data:
                 continue
             key = data["tweet_id"] or data["url"] or (data["content"] + data["timestamp_utc"])
@@ -11,41 +11,83 @@ KEY FIXES:
 6. Cookies/session preservation
 """
 
+import base64
+import csv
+import html
+import json
 import time
 import random
 import re
 import logging
+from collections import Counter
+import sqlite3
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone, timedelta, date
 from pathlib import Path
+from typing import Optional, Union
 from urllib.parse import quote
 
-import pandas as pd
 from selenium import webdriver
-from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException
 
 # --- CONFIGURATION ---
 TARGET = 1000
 CHECKPOINT_EVERY = 100
 
 MAX_SCROLLS_PER_QUERY = 1200     
-REFRESH_EVERY = 600              
-WINDOW_SCAN = 150                
+REFRESH_EVERY = 600              # tweets between pagination nudges
+
+# One logged-in debug Chrome per port (see powershell_command.txt); with more
+# than one, queries are split across them and scraped in parallel processes
+DEBUG_PORTS = [9222]
 
 NO_NEW_TWEET_LIMIT = 25          
 STALL_LIMIT_FOR_QUERY_REFRESH = 8
 
 # Human-like scrolling
 SCROLL_WAIT_MIN = 0.8
-SCROLL_WAIT_MAX = 2.0
+SCROLL_WAIT_MAX = 2.0             # also the cap on waiting for new articles
 SCROLL_PIXELS_MIN = 800
 SCROLL_PIXELS_MAX = 1500
+# Adaptive scrolling: +100px per new tweet (EMA) per loop, capped
+SCROLL_PIXELS_PER_TWEET = 100
+SCROLL_PIXELS_CAP = 3000
+YIELD_EMA_ALPHA = 0.3
+
+# Parsing
+HASHTAG_RE = re.compile(r"#\w+")
+MENTION_RE = re.compile(r"@\w+")
+COUNT_MULTIPLIERS = {"K": 1000, "M": 1_000_000}
+# Plain substring checks: with this few literals `in` beats a compiled
+# alternation (CPython's re has no multi-literal search)
+SPAM_KEYWORDS = ('t.me/', 'wa.me/', 'whatsapp', 'telegram', 'join channel', 'join group')
+BOT_INDICATORS = ('bot', 'alert', 'signal', 'algo')
+
+# The scraper only reads text; media is blocked over CDP after attaching
+BLOCKED_URLS = [
+    "*.jpg", "*.jpeg", "*.png", "*.gif", "*.webp", "*.mp4", "*.webm", "*.m3u8",
+    "*pbs.twimg.com/media/*", "*pbs.twimg.com/profile_images/*", "*video.twimg.com/*",
+]
+
+# Network capture: the search page loads tweets as JSON from this GraphQL endpoint
+TIMELINE_ENDPOINT = "SearchTimeline"
+API_TS_FORMAT = "%a %b %d %H:%M:%S %z %Y"
 
 OUTPUT_DIR = Path("data/raw")
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 OUT_CSV = OUTPUT_DIR / "tweets_combined.csv"
-PARTIAL_CSV = OUTPUT_DIR / "tweets_partial.csv"
+DB_PATH = OUTPUT_DIR / "tweets.db"
+
+# tweets table columns, in CSV order
+COLUMNS = [
+    "tweet_id", "username", "timestamp_utc", "content",
+    "like_count", "retweet_count", "reply_count",
+    "hashtags", "mentions", "url", "query",
+]
 
 # --- BETTER QUERIES (7-DAY WINDOW, NO STRICT FILTERS) ---
 QUERY_TEMPLATES = [
@@ -76,11 +118,11 @@ QUERY_TEMPLATES = [
 
 
 # --- LOGGING ---
-def setup_logging():
+def setup_logging(suffix=""):
     log_dir = Path("logs")
     log_dir.mkdir(exist_ok=True)
     ts = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-    log_file = log_dir / f"x_scraper_{ts}.log"
+    log_file = log_dir / f"x_scraper_{ts}{suffix}.log"
 
     logging.basicConfig(
         level=logging.INFO,
@@ -98,16 +140,25 @@ def log(msg, level="info"):
 
 
 # --- SELENIUM SETUP (SIMPLE & COMPATIBLE) ---
-def build_driver():
+def build_driver(port=9222):
     opts = Options()
     
     # Connect to existing Chrome with remote debugging
-    # Make sure Chrome is running with: chrome.exe --remote-debugging-port=9222
-    opts.add_experimental_option("debuggerAddress", "127.0.0.1:9222")
+    # Make sure Chrome is running with: chrome.exe --remote-debugging-port=<port>
+    opts.add_experimental_option("debuggerAddress", f"127.0.0.1:{port}")
+    # Performance log carries the Network.* events used by timeline_bodies()
+    opts.set_capability("goog:loggingPrefs", {"performance": "ALL"})
     
     driver = webdriver.Chrome(options=opts)
     log("✓ Driver connected successfully")
     
+    # Skip images/video downloads (optional - the page works the same without)
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URLS})
+    except:
+        pass
+    
     # Try to hide automation (optional - may fail on older Chrome)
     try:
         driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
@@ -117,14 +168,37 @@ def build_driver():
     return driver
 
 
+def enable_network_capture(driver) -> bool:
+    """Read tweets from the GraphQL responses when CDP + performance logs are available"""
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.get_log("performance")
+        log("✓ Network capture enabled (DOM scraping is the fallback)")
+        return True
+    except Exception as e:
+        log(f"Network capture unavailable, scraping the DOM only: {e}", "warning")
+        return False
+
+
 # --- HUMAN-LIKE SCROLLING ---
-def human_scroll(driver, pixels=None):
+def scroll_pixels(ema_yield: float) -> int:
+    """Scroll further while pages come back dense, less while they trickle in"""
+    base = SCROLL_PIXELS_MIN + SCROLL_PIXELS_PER_TWEET * ema_yield
+    # Jitter first, then clamp, so the bounds hold exactly
+    return int(min(max(base * random.uniform(0.9, 1.1), SCROLL_PIXELS_MIN), SCROLL_PIXELS_CAP))
+
+
+def human_scroll(driver, pixels=None, to_bottom=False):
     """Scroll like a human - random amounts, slight pauses"""
     if pixels is None:
         pixels = random.randint(SCROLL_PIXELS_MIN, SCROLL_PIXELS_MAX)
+    before = driver.execute_script(TAIL_JS)
     
+    if to_bottom:
+        # Straight to the end so the pagination request fires
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
     # Sometimes scroll in chunks (more human)
-    if random.random() < 0.3:
+    elif random.random() < 0.3:
         chunk = pixels // 2
         driver.execute_script(f"window.scrollBy(0, {chunk});")
         time.sleep(random.uniform(0.1, 0.3))
@@ -132,8 +206,15 @@ def human_scroll(driver, pixels=None):
     else:
         driver.execute_script(f"window.scrollBy(0, {pixels});")
     
-    # Random wait
-    time.sleep(random.uniform(SCROLL_WAIT_MIN, SCROLL_WAIT_MAX))
+    # Wait until the timeline actually changed (X recycles articles, so the
+    # last one's link moves even when the count doesn't), then a short jitter
+    try:
+        WebDriverWait(driver, SCROLL_WAIT_MAX, poll_frequency=0.1).until(
+            lambda d: d.execute_script(TAIL_JS) != before
+        )
+    except TimeoutException:
+        pass
+    time.sleep(random.uniform(0.1, 0.3))
     
     # Occasionally scroll up slightly (human behavior)
     if random.random() < 0.05:
@@ -141,34 +222,100 @@ def human_scroll(driver, pixels=None):
         time.sleep(random.uniform(0.3, 0.6))
 
 
-# --- HELPERS ---
-def safe_text(el, css):
-    try:
-        return el.find_element(By.CSS_SELECTOR, css).text.strip()
-    except:
-        return ""
+def nudge_timeline(driver):
+    """Top-then-bottom scroll: re-triggers pagination without reloading the page"""
+    driver.execute_script("window.scrollTo(0, 0);")
+    time.sleep(random.uniform(0.4, 0.8))
+    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+    time.sleep(random.uniform(SCROLL_WAIT_MIN, SCROLL_WAIT_MAX))
 
-def safe_attr(el, css, attr):
-    try:
-        return el.find_element(By.CSS_SELECTOR, css).get_attribute(attr)
-    except:
-        return None
+
+# --- HELPERS ---
+# A MutationObserver queues every article X inserts; each call drains that
+# queue in one round-trip, so each tweet is extracted once instead of
+# re-reading the tail window every scroll. The state lives on window, so it
+# is installed again automatically after driver.get()/refresh().
+# Arguments: cutoff ISO timestamp and spam keywords. Old, short and spammy
+# tweets are dropped in-page so they never cross the WebDriver boundary;
+# extract_tweet still applies the exact checks to whatever comes back.
+EXTRACT_JS = """
+if (!window.__tweets) {
+    const state = window.__tweets = {seen: new Set(), pending: Array.from(document.querySelectorAll('article'))};
+    new MutationObserver(muts => {
+        for (const m of muts) {
+            for (const n of m.addedNodes) {
+                if (n.nodeType !== 1) continue;
+                if (n.matches('article')) state.pending.push(n);
+                else state.pending.push(...n.querySelectorAll('article'));
+            }
+        }
+    }).observe(document.body, {childList: true, subtree: true});
+}
+const state = window.__tweets;
+const [cutoff, spam] = arguments;
+const text = (el, sel) => (el.querySelector(sel)?.innerText || '').trim();
+const metric = (a, ids) => {
+    for (const id of ids) {
+        const el = a.querySelector(`[data-testid="${id}"]`);
+        if (!el) continue;
+        const t = (el.innerText || '').trim();
+        if (t) return t;
+        for (const sp of el.querySelectorAll('span')) {
+            const st = (sp.innerText || '').trim();
+            if (st) return st;
+        }
+    }
+    return '';
+};
+const pending = state.pending;
+state.pending = [];
+const tweets = [];
+for (const a of pending) {
+    if (!a.isConnected) continue;  // recycled by X before we got to it
+    const url = a.querySelector('a[href*="/status/"]')?.href || '';
+    const ts = a.querySelector('time')?.dateTime || '';
+    if (!url || !ts) {
+        state.pending.push(a);  // still rendering; retry on the next drain
+        continue;
+    }
+    if (state.seen.has(url)) continue;
+    state.seen.add(url);
+    if (ts < cutoff) continue;
+    const content = text(a, '[data-testid="tweetText"]');
+    const lower = content.toLowerCase();
+    if (content.length < 20 || spam.some(k => lower.includes(k))) continue;
+    tweets.push({
+        ts: ts,
+        url: url,
+        content: content,
+        user: text(a, '[data-testid="User-Name"]'),
+        like: metric(a, ['like']),
+        retweet: metric(a, ['retweet', 'repost']),
+        reply: metric(a, ['reply']),
+    });
+}
+return {count: document.querySelectorAll('article').length, tweets: tweets};
+"""
+COUNT_JS = "return document.querySelectorAll('article').length;"
+TAIL_JS = """
+const all = document.querySelectorAll('article');
+const last = all[all.length - 1];
+return [all.length, last?.querySelector('a[href*="/status/"]')?.href || ''];
+"""
 
 def parse_count(s: str) -> int:
     s = (s or "").replace(",", "").strip()
     if not s:
         return 0
-    mult = 1
-    if s.endswith("K"):
-        mult, s = 1000, s[:-1]
-    elif s.endswith("M"):
-        mult, s = 1_000_000, s[:-1]
+    mult = COUNT_MULTIPLIERS.get(s[-1], 1)
     try:
-        return int(float(s) * mult)
+        return int(float(s[:-1] if mult > 1 else s) * mult)
     except:
         return 0
 
-def parse_ts(ts: str):
+# Overlapping queries and retried articles repeat the same timestamps
+@lru_cache(maxsize=8192)
+def parse_ts(ts: str) -> Optional[datetime]:
     if not ts:
         return None
     try:
@@ -182,67 +329,93 @@ def build_url(query: str) -> str:
     q = f"({query}) since:{week_ago}"
     return f"https://x.com/search?q={quote(q)}&src=typed_query&f=live"
 
-def checkpoint(rows):
-    try:
-        pd.DataFrame(rows).to_csv(PARTIAL_CSV, index=False, encoding="utf-8")
-        log(f"✓ Checkpoint: {len(rows)} rows")
-    except Exception as e:
-        log(f"Checkpoint failed: {e}", "error")
-
-def metric_count(article, testid_options):
-    for tid in testid_options:
+class TweetStore:
+    """SQLite cache of every saved tweet, shared across runs (and parallel workers).
+    save() inserts only the rows added since the last call."""
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS tweets ("
+            "tweet_id TEXT PRIMARY KEY, username TEXT, timestamp_utc TEXT, content TEXT, "
+            "like_count INTEGER, retweet_count INTEGER, reply_count INTEGER, "
+            "hashtags TEXT, mentions TEXT, url TEXT, query TEXT)"
+        )
+        self.conn.commit()
+        self.saved = 0
+
+    def known_ids(self):
+        return {tweet_key(tid) for (tid,) in self.conn.execute("SELECT tweet_id FROM tweets")}
+
+    def save(self, rows):
+        pending = rows[self.saved:]
+        if not pending:
+            return
         try:
-            el = article.find_element(By.CSS_SELECTOR, f'[data-testid="{tid}"]')
-            txt = (el.text or "").strip()
-            if txt:
-                return parse_count(txt)
-            for sp in el.find_elements(By.CSS_SELECTOR, "span"):
-                t = (sp.text or "").strip()
-                if t:
-                    return parse_count(t)
-        except:
-            continue
-    return 0
-
-def extract_username(article):
-    block = safe_text(article, '[data-testid="User-Name"]')
+            self.conn.executemany(
+                f"INSERT OR IGNORE INTO tweets VALUES ({','.join('?' * len(COLUMNS))})",
+                [tuple(r.get(c) for c in COLUMNS) for r in pending],
+            )
+            self.conn.commit()
+            self.saved = len(rows)
+            log(f"✓ Checkpoint: {len(rows)} rows")
+        except Exception as e:
+            log(f"Checkpoint failed: {e}", "error")
+
+    def recent(self, since: datetime) -> list:
+        # timestamp_utc is ISO-8601 UTC everywhere, so string order is time order
+        cursor = self.conn.execute(
+            f"SELECT {', '.join(COLUMNS)} FROM tweets WHERE timestamp_utc >= ? ORDER BY timestamp_utc DESC",
+            (since.strftime("%Y-%m-%dT%H:%M:%S"),),
+        )
+        return [dict(zip(COLUMNS, row)) for row in cursor]
+
+    def close(self):
+        self.conn.close()
+
+
+def extract_username(block: str) -> str:
     if block:
-        m = re.search(r"@\w+", block)
+        m = MENTION_RE.search(block)
         if m:
             return m.group(0)
         return block.splitlines()[0].strip()
     return ""
 
-def extract_tweet(article, cutoff_time):
-    """Extract tweet data with spam filtering"""
+def is_spam(content: str, username: str) -> bool:
+    # SPAM FILTERS - Skip these immediately
+    if not content or len(content) < 20:  # Too short
+        return True
+    
+    content_lower = content.lower()
+    if any(kw in content_lower for kw in SPAM_KEYWORDS):  # Promotional spam
+        return True
+    
+    username_lower = (username or "").lower()
+    if any(ind in username_lower for ind in BOT_INDICATORS):  # Bot account
+        return True
+    return False
+
+def tweet_key(tid: str) -> Union[int, str]:
+    """seen_ids key: snowflake ids as ints, about half the memory of the digit strings"""
+    return int(tid) if tid and tid.isdigit() else tid
+
+def extract_tweet(raw: dict, cutoff_time: datetime) -> Union[dict, str, None]:
+    """Turn one EXTRACT_JS record into a tweet row, with spam filtering"""
     try:
-        ts_raw = safe_attr(article, "time", "datetime")
+        ts_raw = raw.get("ts")
         ts = parse_ts(ts_raw)
         if not ts or ts < cutoff_time:
             return "OLD"
 
-        links = article.find_elements(By.CSS_SELECTOR, 'a[href*="/status/"]')
-        if not links:
-            return None
-        url = (links[0].get_attribute("href") or "").split("?")[0]
+        url = (raw.get("url") or "").split("?")[0]
         if not url or "/status/" not in url:
             return None
 
-        content = safe_text(article, '[data-testid="tweetText"]')
-        username = extract_username(article)
-        
-        # SPAM FILTERS - Skip these immediately
-        if not content or len(content) < 20:  # Too short
-            return None
-        
-        content_lower = content.lower()
-        spam_keywords = ['t.me/', 'wa.me/', 'whatsapp', 'telegram', 'join channel', 'join group']
-        if any(kw in content_lower for kw in spam_keywords):  # Promotional spam
-            return None
-        
-        username_lower = (username or "").lower()
-        bot_indicators = ['bot', 'alert', 'signal', 'algo']
-        if any(ind in username_lower for ind in bot_indicators):  # Bot account
+        content = raw.get("content") or ""
+        username = extract_username(raw.get("user"))
+        if is_spam(content, username):
             return None
 
         return {
@@ -250,25 +423,154 @@ def extract_tweet(article, cutoff_time):
             "username": username,
             "timestamp_utc": ts_raw,
             "content": content,
-            "like_count": metric_count(article, ["like"]),
-            "retweet_count": metric_count(article, ["retweet", "repost"]),
-            "reply_count": metric_count(article, ["reply"]),
-            "hashtags": ",".join(re.findall(r"#\w+", content)),
-            "mentions": ",".join(re.findall(r"@\w+", content)),
+            "like_count": parse_count(raw.get("like")),
+            "retweet_count": parse_count(raw.get("retweet")),
+            "reply_count": parse_count(raw.get("reply")),
+            "hashtags": ",".join(HASHTAG_RE.findall(content)),
+            "mentions": ",".join(MENTION_RE.findall(content)),
             "url": url,
         }
     except:
         return None
 
 
+def timeline_bodies(driver, pending: set):
+    """Decoded SearchTimeline responses that finished loading since the last call.
+
+    A body is only readable once Network.loadingFinished fires, which can be a
+    poll or two after Network.responseReceived, so request ids seen on the
+    response wait in `pending` (kept by the caller across polls) until then.
+    """
+    finished = []
+    for entry in driver.get_log("performance"):
+        message = entry["message"]
+        # Cheap substring checks first; the performance log is mostly noise
+        if TIMELINE_ENDPOINT not in message and not (pending and "Network.loading" in message):
+            continue
+        try:
+            event = json.loads(message)["message"]
+            method, params = event["method"], event["params"]
+            if method == "Network.responseReceived":
+                if TIMELINE_ENDPOINT in params["response"]["url"]:
+                    pending.add(params["requestId"])
+            elif method in ("Network.loadingFinished", "Network.loadingFailed"):
+                if params["requestId"] in pending:
+                    pending.discard(params["requestId"])
+                    if method == "Network.loadingFinished":
+                        finished.append(params["requestId"])
+        except:
+            continue
+
+    bodies = []
+    for request_id in finished:
+        try:
+            body = driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+            text = body["body"]
+            if body.get("base64Encoded"):
+                text = base64.b64decode(text).decode("utf-8")
+            bodies.append(json.loads(text))
+        except:
+            continue  # body evicted; the DOM fallback covers it
+    return bodies
+
+def timeline_results(body: dict):
+    """Tweet result objects from one SearchTimeline response"""
+    timeline = body["data"]["search_by_raw_query"]["search_timeline"]["timeline"]
+    for instruction in timeline.get("instructions", []):
+        entries = instruction.get("entries") or [instruction.get("entry") or {}]
+        for entry in entries:
+            content = entry.get("content") or {}
+            items = [content.get("itemContent")]
+            items += [(i.get("item") or {}).get("itemContent") for i in content.get("items", [])]
+            for item in items:
+                result = ((item or {}).get("tweet_results") or {}).get("result") or {}
+                if result.get("__typename") == "TweetWithVisibilityResults":
+                    result = result.get("tweet") or {}
+                if "legacy" in result:
+                    yield result
+
+def api_tweet(result: dict, cutoff_time: datetime) -> Union[dict, str, None]:
+    """Turn one GraphQL tweet result into the same row shape as extract_tweet"""
+    try:
+        legacy = result["legacy"]
+        ts = datetime.strptime(legacy["created_at"], API_TS_FORMAT)
+        if ts < cutoff_time:
+            return "OLD"
+
+        user = ((result.get("core") or {}).get("user_results") or {}).get("result") or {}
+        screen_name = (user.get("core") or {}).get("screen_name") or (user.get("legacy") or {}).get("screen_name") or ""
+        username = f"@{screen_name}" if screen_name else ""
+
+        # Long posts keep their full text outside legacy
+        note = ((result.get("note_tweet") or {}).get("note_tweet_results") or {}).get("result") or {}
+        content = html.unescape(note.get("text") or legacy.get("full_text") or "")
+        if is_spam(content, username):
+            return None
+
+        tweet_id = legacy.get("id_str") or result.get("rest_id")
+        entities = legacy.get("entities") or {}
+        return {
+            "tweet_id": tweet_id,
+            "username": username,
+            "timestamp_utc": ts.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+            "content": content,
+            "like_count": int(legacy.get("favorite_count") or 0),
+            "retweet_count": int(legacy.get("retweet_count") or 0),
+            "reply_count": int(legacy.get("reply_count") or 0),
+            "hashtags": ",".join("#" + h["text"] for h in entities.get("hashtags", [])),
+            "mentions": ",".join("@" + m["screen_name"] for m in entities.get("user_mentions", [])),
+            "url": f"https://x.com/{screen_name or 'i'}/status/{tweet_id}",
+        }
+    except:
+        return None
+
+def parse_timeline(bodies: list, cutoff_time: datetime, seen_ids: set) -> tuple[list, int]:
+    """Same contract as parse_batch, but for captured SearchTimeline responses"""
+    parsed, old_count = [], 0
+    for body in bodies:
+        try:
+            results = list(timeline_results(body))
+        except:
+            continue
+        for result in results:
+            if tweet_key((result.get("legacy") or {}).get("id_str")) in seen_ids:
+                continue
+            data = api_tweet(result, cutoff_time)
+            if data == "OLD":
+                old_count += 1
+            elif data:
+                parsed.append(data)
+    return parsed, old_count
+
+
 # --- SCRAPING WITH STEALTH ---
-def scrape_query(driver, query_label: str, query: str, rows, seen_ids, target_total: int):
+def parse_batch(raw_tweets: list, cutoff_time: datetime, seen_ids: set) -> tuple[list, int]:
+    """Parse one EXTRACT_JS batch; runs on a worker thread, dedup stays on the caller"""
+    parsed, old_count = [], 0
+    for raw in raw_tweets:
+        # Tweets already saved (overlapping queries, resumed runs) are skipped
+        # before paying for timestamp parsing and the spam checks
+        if tweet_key((raw.get("url") or "").split("?")[0].rsplit("/", 1)[-1]) in seen_ids:
+            continue
+        data = extract_tweet(raw, cutoff_time)
+        if data == "OLD":
+            old_count += 1
+        elif data:
+            parsed.append(data)
+    return parsed, old_count
+
+
+def scrape_query(driver, query_label: str, query: str, rows, seen_ids, target_total: int, store, capture=False):
     url = build_url(query)
     cutoff_time = datetime.now(timezone.utc) - timedelta(days=7)  # 7-day window
+    cutoff_iso = cutoff_time.strftime("%Y-%m-%dT%H:%M:%S.000Z")
     
     log(f"╔══ Query: {query_label} - '{query}' ══╗")
     log(f"║ Target: {target_total - len(rows)} more tweets")
     
+    pending_responses = set()  # SearchTimeline request ids still loading
+    if capture:
+        driver.get_log("performance")  # drop responses from the previous query
     driver.get(url)
     
     # Longer initial wait for page to fully load
@@ -277,6 +579,7 @@ def scrape_query(driver, query_label: str, query: str, rows, seen_ids, target_to
     scrolls = 0
     last_refresh_count = len(rows)
     no_new_loops = 0
+    ema_yield = 0.0
     stalled_loops = 0
     prev_dom_count = 0
     consecutive_zeros = 0
@@ -284,103 +587,164 @@ def scrape_query(driver, query_label: str, query: str, rows, seen_ids, target_to
     query_start = time.time()
     tweets_at_start = len(rows)
 
-    while len(rows) < target_total and scrolls < MAX_SCROLLS_PER_QUERY:
-        articles = driver.find_elements(By.CSS_SELECTOR, "article")
-        dom_count = len(articles)
+    with ThreadPoolExecutor(max_workers=1) as parser:
+        while len(rows) < target_total and scrolls < MAX_SCROLLS_PER_QUERY:
+            parsed = []
+            if capture:
+                parsed, old_count = parse_timeline(
+                    timeline_bodies(driver, pending_responses), cutoff_time, seen_ids
+                )
+
+            if parsed:
+                # Exact counts/ids came from the API; the DOM is only needed for its size
+                dom_count = driver.execute_script(COUNT_JS)
+                human_scroll(driver, scroll_pixels(ema_yield), to_bottom=no_new_loops > 3)
+            else:
+                batch = driver.execute_script(EXTRACT_JS, cutoff_iso, SPAM_KEYWORDS)
+                dom_count = batch["count"]
+
+                # Parse on the worker thread while the driver scrolls for the next batch
+                parsing = parser.submit(parse_batch, batch["tweets"], cutoff_time, seen_ids)
+                human_scroll(driver, scroll_pixels(ema_yield), to_bottom=no_new_loops > 3)
+                parsed, old_count = parsing.result()
         
-        # DEBUG: Log first load to diagnose issues
-        if scrolls == 0:
-            log(f"║ DEBUG - First load: {dom_count} articles found")
-            log(f"║ DEBUG - Page title: {driver.title[:50]}")
-            if dom_count < 10:
-                log(f"║ ⚠️  WARNING: Low article count! X might be blocking or rate-limiting.", "warning")
+            # DEBUG: Log first load to diagnose issues
+            if scrolls == 0:
+                log(f"║ DEBUG - First load: {dom_count} articles found")
+                log(f"║ DEBUG - Page title: {driver.title[:50]}")
+                if dom_count < 10:
+                    log(f"║ ⚠️  WARNING: Low article count! X might be blocking or rate-limiting.", "warning")
+
+            new_this_batch = 0
+            for data in parsed:
+                tid = tweet_key(data["tweet_id"])
+                if tid in seen_ids:
+                    continue
+
+                seen_ids.add(tid)
+                data["query"] = query_label
+                rows.append(data)
+                new_this_batch += 1
+            ema_yield += YIELD_EMA_ALPHA * (new_this_batch - ema_yield)
+
+            # Status every 50 loops
+            if scrolls % 50 == 0:
+                elapsed = int(time.time() - query_start)
+                rate = (len(rows) - tweets_at_start) / max(elapsed, 1) * 60
+                log(f"║ Loop {scrolls} | Total: {len(rows)}/{target_total} | New: {new_this_batch} | DOM: {dom_count} | Rate: {rate:.1f}/min")
+
+            # Checkpoint
+            if new_this_batch > 0 and (len(rows) // CHECKPOINT_EVERY) > ((len(rows) - new_this_batch) // CHECKPOINT_EVERY):
+                elapsed = int(time.time() - query_start)
+                rate = (len(rows) - tweets_at_start) / max(elapsed, 1) * 60
+                log(f"╠═ Progress: {len(rows)}/{target_total} ({rate:.1f} tweets/min)")
+                store.save(rows)
+
+            # Track consecutive zero-new-tweet loops
+            if new_this_batch == 0:
+                consecutive_zeros += 1
+                no_new_loops += 1
+                if dom_count <= prev_dom_count:
+                    stalled_loops += 1
+                else:
+                    stalled_loops = 0
+            else:
+                consecutive_zeros = 0
+                no_new_loops = 0
+                stalled_loops = 0
 
-        new_this_batch = 0
-        old_count = 0
+            prev_dom_count = dom_count
 
-        window = articles[-WINDOW_SCAN:] if len(articles) > WINDOW_SCAN else articles
-        
-        for art in window:
-            data = extract_tweet(art, cutoff_time)
-            
-            if data == "OLD":
-                old_count += 1
-                continue
-            if not data:
+            # If DOM is suspiciously small (< 3) and we're not getting tweets, X might be blocking
+            if dom_count < 3 and consecutive_zeros > 3:
+                log(f"║ ⚠ Low DOM count ({dom_count}) - possible rate limit. Waiting 30s...")
+                time.sleep(30)
+                driver.refresh()
+                time.sleep(random.uniform(5, 7))
+                consecutive_zeros = 0
                 continue
 
-            tid = data["tweet_id"]
-            if tid in seen_ids:
-                continue
+            # Exit if query exhausted
+            if no_new_loops >= NO_NEW_TWEET_LIMIT:
+                elapsed = int(time.time() - query_start)
+                found = len(rows) - tweets_at_start
+                log(f"╚═ Query exhausted. Found {found} tweets in {elapsed}s")
+                break
 
-            seen_ids.add(tid)
-            data["query"] = query_label
-            rows.append(data)
-            new_this_batch += 1
-
-        # Status every 50 loops
-        if scrolls % 50 == 0:
-            elapsed = int(time.time() - query_start)
-            rate = (len(rows) - tweets_at_start) / max(elapsed, 1) * 60
-            log(f"║ Loop {scrolls} | Total: {len(rows)}/{target_total} | New: {new_this_batch} | DOM: {dom_count} | Rate: {rate:.1f}/min")
-
-        # Checkpoint
-        if new_this_batch > 0 and (len(rows) // CHECKPOINT_EVERY) > ((len(rows) - new_this_batch) // CHECKPOINT_EVERY):
-            elapsed = int(time.time() - query_start)
-            rate = (len(rows) - tweets_at_start) / max(elapsed, 1) * 60
-            log(f"╠═ Progress: {len(rows)}/{target_total} ({rate:.1f} tweets/min)")
-            checkpoint(rows)
-
-        # Track consecutive zero-new-tweet loops
-        if new_this_batch == 0:
-            consecutive_zeros += 1
-            no_new_loops += 1
-            if dom_count <= prev_dom_count:
-                stalled_loops += 1
-            else:
+            # Nudge on persistent stall; a full reload costs seconds
+            if stalled_loops >= STALL_LIMIT_FOR_QUERY_REFRESH:
+                log(f"║ Stalled. Nudging timeline...")
+                nudge_timeline(driver)
                 stalled_loops = 0
-        else:
-            consecutive_zeros = 0
-            no_new_loops = 0
-            stalled_loops = 0
-
-        prev_dom_count = dom_count
-
-        # If DOM is suspiciously small (< 3) and we're not getting tweets, X might be blocking
-        if dom_count < 3 and consecutive_zeros > 3:
-            log(f"║ ⚠ Low DOM count ({dom_count}) - possible rate limit. Waiting 30s...")
-            time.sleep(30)
-            driver.refresh()
-            time.sleep(random.uniform(5, 7))
-            consecutive_zeros = 0
-            continue
+                continue
+
+            scrolls += 1
+
+            # Periodic nudge
+            if len(rows) - last_refresh_count >= REFRESH_EVERY:
+                log(f"║ Pagination nudge at {len(rows)} tweets...")
+                nudge_timeline(driver)
+                last_refresh_count = len(rows)
+
 
-        # Exit if query exhausted
-        if no_new_loops >= NO_NEW_TWEET_LIMIT:
-            elapsed = int(time.time() - query_start)
-            found = len(rows) - tweets_at_start
-            log(f"╚═ Query exhausted. Found {found} tweets in {elapsed}s")
+def scrape_queries(driver, queries, rows, seen_ids, target_total: int, store, capture=False):
+    for label, q in queries:
+        if len(rows) >= target_total:
             break
 
-        # Refresh on persistent stall
-        if stalled_loops >= STALL_LIMIT_FOR_QUERY_REFRESH:
-            log(f"║ Stalled. Refreshing...")
-            driver.refresh()
-            time.sleep(random.uniform(4, 6))
-            stalled_loops = 0
-            continue
+        scrape_query(driver, label, q, rows, seen_ids, target_total, store, capture)
 
-        # HUMAN-LIKE SCROLLING
-        human_scroll(driver)
+        # Longer pause between queries (avoid rate limits)
+        if len(rows) < target_total:
+            wait_time = random.uniform(5, 10)
+            log(f"Waiting {wait_time:.1f}s before next query...")
+            time.sleep(wait_time)
 
-        scrolls += 1
 
-        # Periodic refresh
-        if len(rows) - last_refresh_count >= REFRESH_EVERY:
-            log(f"║ DOM refresh at {len(rows)} tweets...")
-            driver.refresh()
-            time.sleep(random.uniform(5, 7))
-            last_refresh_count = len(rows)
+def scrape_worker(port, queries, target_total: int):
+    """One process per debug Chrome; WebDriver sessions must not be shared across threads"""
+    setup_logging(f"_{port}")
+    store = TweetStore(DB_PATH)
+    seen_ids = store.known_ids()
+    rows = []
+    driver = build_driver(port)
+    try:
+        capture = enable_network_capture(driver)
+        scrape_queries(driver, queries, rows, seen_ids, target_total, store, capture)
+    finally:
+        store.save(rows)
+        store.close()
+        try:
+            driver.quit()
+        except:
+            pass
+    return rows
+
+
+def scrape_parallel(queries, rows):
+    """Split queries round-robin across DEBUG_PORTS; workers write to the shared TweetStore"""
+    merged_ids = set()  # workers don't share seen_ids, so two can return the same tweet
+    n = len(DEBUG_PORTS)
+    share = -(-TARGET // n)
+    log(f"Parallel mode: {n} Chrome instances, {share} tweets each")
+    with ProcessPoolExecutor(max_workers=n) as pool:
+        futures = {
+            pool.submit(scrape_worker, port, queries[i::n], share): port
+            for i, port in enumerate(DEBUG_PORTS)
+        }
+        for future in as_completed(futures):
+            try:
+                worker_rows = future.result()
+                fresh = []
+                for data in worker_rows:
+                    tid = tweet_key(data["tweet_id"])
+                    if tid not in merged_ids:
+                        merged_ids.add(tid)
+                        fresh.append(data)
+                log(f"Port {futures[future]}: {len(worker_rows)} tweets, {len(fresh)} not seen by other workers")
+                rows.extend(fresh)
+            except Exception as e:
+                log(f"Port {futures[future]} failed: {e}", "error")
 
 
 def main():
@@ -390,24 +754,22 @@ def main():
     log(f"Target: {TARGET} tweets")
     log("=" * 70)
 
-    driver = build_driver()
+    queries = [(f"Q{i}", q) for i, q in enumerate(QUERY_TEMPLATES, start=1)]
+    parallel = len(DEBUG_PORTS) > 1
+    driver = None if parallel else build_driver(DEBUG_PORTS[0])
+    capture = False if parallel else enable_network_capture(driver)
+    store = TweetStore(DB_PATH)
+    # Tweets saved by earlier (or interrupted) runs are skipped, not re-scraped
+    seen_ids = store.known_ids()
+    log(f"Known tweets in cache: {len(seen_ids)}")
     rows = []
-    seen_ids = set()
     start_time = time.time()
 
     try:
-        for i, q in enumerate(QUERY_TEMPLATES, start=1):
-            if len(rows) >= TARGET:
-                break
-            
-            label = f"Q{i}"
-            scrape_query(driver, label, q, rows, seen_ids, TARGET)
-            
-            # Longer pause between queries (avoid rate limits)
-            if len(rows) < TARGET:
-                wait_time = random.uniform(5, 10)
-                log(f"Waiting {wait_time:.1f}s before next query...")
-                time.sleep(wait_time)
+        if parallel:
+            scrape_parallel(queries, rows)
+        else:
+            scrape_queries(driver, queries, rows, seen_ids, TARGET, store, capture)
 
         elapsed = int(time.time() - start_time)
         rate = len(rows) / max(elapsed / 60, 1)
@@ -423,34 +785,40 @@ def main():
         import traceback
         log(traceback.format_exc(), "error")
     finally:
-        if rows:
-            df = pd.DataFrame(rows).drop_duplicates("tweet_id")
-            df.to_csv(OUT_CSV, index=False, encoding="utf-8")
+        store.save(rows)
+        # Everything cached inside the 7-day window, including earlier runs
+        saved = store.recent(datetime.now(timezone.utc) - timedelta(days=7))
+        store.close()
+        if saved:
+            with open(OUT_CSV, "w", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=COLUMNS)
+                writer.writeheader()
+                writer.writerows(saved)
             
             elapsed = int(time.time() - start_time)
-            rate = len(df) / max(elapsed / 60, 1)
+            rate = len(rows) / max(elapsed / 60, 1)
             
             log("=" * 70)
-            log(f"SAVED: {len(df)} unique tweets → {OUT_CSV}")
+            log(f"SAVED: {len(saved)} unique tweets ({len(rows)} new this run) → {OUT_CSV}")
             log(f"Time: {elapsed}s | Rate: {rate:.1f} tweets/min")
             log("=" * 70)
             
             # Stats
-            log(f"Hashtags: {df['hashtags'].str.len().gt(0).sum()}")
-            log(f"Mentions: {df['mentions'].str.len().gt(0).sum()}")
-            log(f"Avg engagement: {df['like_count'].mean():.1f} likes")
+            log(f"Hashtags: {sum(1 for r in saved if r['hashtags'])}")
+            log(f"Mentions: {sum(1 for r in saved if r['mentions'])}")
+            log(f"Avg engagement: {sum(r['like_count'] or 0 for r in saved) / len(saved):.1f} likes")
             
             # Top hashtags
-            all_tags = df['hashtags'].str.split(',').explode()
-            top_tags = all_tags[all_tags != ''].value_counts().head(10)
-            log(f"Top hashtags: {', '.join(top_tags.index.tolist()[:5])}")
+            top_tags = Counter(t for r in saved for t in (r['hashtags'] or '').split(',') if t)
+            log(f"Top hashtags: {', '.join(tag for tag, _ in top_tags.most_common(5))}")
         else:
             log("No tweets collected.", "warning")
 
-        try:
-            driver.quit()
-        except:
-            pass
+        if driver is not None:
+            try:
+                driver.quit()
+            except:
+                pass
 
 
 if __name__ == "__main__":
@@ -5,96 +5,131 @@ Cleans, normalizes, and partitions tweet data into Parquet format
 
 import re
 import json
-import unicodedata
 from pathlib import Path
-from datetime import datetime, timezone, timedelta
-from concurrent.futures import ProcessPoolExecutor, as_completed
-from typing import List, Tuple
+from typing import List
 
+import numpy as np
 import pandas as pd
-from tqdm import tqdm
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.dataset as ds
 
 
 INPUT_CSV = "data/raw/tweets_combined.csv"
 OUTPUT_DIR = Path("data/processed_parquet")
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-MAX_WORKERS = 4
+# hashtags/mentions are written as native list<string> columns; set True to
+# also write the old hashtags_json/mentions_json string columns
+LEGACY_JSON = False
+LIST_COLUMNS = ["hashtags", "mentions"]
+# A day of tweets fits in one row group; stats per group let readers skip whole groups
+ROW_GROUP_SIZE = 50_000
+COUNT_COLUMNS = ["like_count", "retweet_count", "reply_count"]
+COUNT_DTYPE = "int32"
+# Read as strings even when every value is empty; left to inference, an
+# all-empty column comes back as Arrow's null type, which fillna("") rejects
+STRING_COLUMNS = [
+    "tweet_id", "username", "handle", "timestamp_utc", "content", "hashtags", "mentions", "url",
+]
+OUTPUT_COLUMNS = [
+    "tweet_id",
+    "username",
+    "handle",
+    "timestamp_utc",
+    "content",
+    "like_count",
+    "retweet_count",
+    "reply_count",
+    "hashtags",
+    "mentions",
+    "hashtags_json",
+    "mentions_json",
+    "url",
+    "date",
+]
 
 ZERO_WIDTH_CHARS = "".join(["\u200b", "\u200c", "\u200d", "\ufeff"])
+HASHTAG_RE = re.compile(r"#\w+")
+MENTION_RE = re.compile(r"@\w+")
+# RE2 patterns for Arrow compute; \s in RE2 is ASCII-only, so the class spells
+# out every character Python's str.isspace() accepts
+ZERO_WIDTH_PATTERN = "[" + ZERO_WIDTH_CHARS + "]"
+WHITESPACE_PATTERN = (
+    r"[\t-\r\x1c-\x20\x85\xa0\x{1680}\x{2000}-\x{200a}"
+    r"\x{2028}\x{2029}\x{202f}\x{205f}\x{3000}]+"
+)
+COUNT_RE = r"^([0-9.]*)([KM]?)$"
+COUNT_MULTIPLIERS = {"": 1, "K": 1_000, "M": 1_000_000}
+
+
+def normalize_series(s: pd.Series) -> pd.Series:
+    """NFKC + zero-width strip + whitespace collapse, in Arrow's C++ kernels"""
+    arr = pa.array(s.fillna("").astype("string[pyarrow]"))
+    arr = pc.utf8_normalize(arr, form="NFKC")
+    arr = pc.replace_substring_regex(arr, ZERO_WIDTH_PATTERN, "")
+    arr = pc.replace_substring_regex(arr, WHITESPACE_PATTERN, " ")
+    arr = pc.utf8_trim_whitespace(arr)
+    return pd.Series(arr, index=s.index, dtype="string[pyarrow]")
+
+
+def split_csv_series(s: pd.Series) -> pd.Series:
+    """Comma-separated cell -> list of stripped, non-empty items"""
+    return s.fillna("").astype(str).str.split(",").map(
+        lambda xs: [x.strip() for x in xs if x.strip()]
+    )
 
 
-def normalize_text(text: str) -> str:
-    if text is None or (isinstance(text, float) and pd.isna(text)):
-        return ""
-    text = str(text)
-    text = unicodedata.normalize("NFKC", text)
-    text = text.translate({ord(c): None for c in ZERO_WIDTH_CHARS})
-    return re.sub(r"\s+", " ", text).strip()
-
-
-def safe_int(value, default=0) -> int:
-    try:
-        return default if pd.isna(value) else int(value)
-    except (ValueError, TypeError):
-        return default
-
-
-def parse_timestamp(ts_str: str):
-    if ts_str is None or (isinstance(ts_str, float) and pd.isna(ts_str)):
-        return None
-    try:
-        return datetime.fromisoformat(str(ts_str).replace("Z", "+00:00"))
-    except (ValueError, TypeError):
-        return None
-
-
-def extract_hashtags(text: str) -> List[str]:
-    return re.findall(r"#\w+", text or "")
-
-
-def extract_mentions(text: str) -> List[str]:
-    return re.findall(r"@\w+", text or "")
-
-
-def parse_csv_col(value) -> List[str]:
-    if value is None or (isinstance(value, float) and pd.isna(value)):
-        return []
-    s = str(value).strip()
-    return [x.strip() for x in s.split(",") if x.strip()] if s else []
-
-
-def process_partition(date_str: str, partition_df: pd.DataFrame) -> Tuple[str, int]:
-    try:
-        partition_df["like_count"] = partition_df["like_count"].apply(safe_int)
-        partition_df["retweet_count"] = partition_df["retweet_count"].apply(safe_int)
-        partition_df["reply_count"] = partition_df["reply_count"].apply(safe_int)
-
-        cols = [
-            "tweet_id",
-            "username",
-            "handle",
-            "timestamp_utc",
-            "content",
-            "like_count",
-            "retweet_count",
-            "reply_count",
-            "hashtags_json",
-            "mentions_json",
-            "url",
-            "date",
-        ]
-        cols = [c for c in cols if c in partition_df.columns]
-
-        partition_dir = OUTPUT_DIR / f"date={date_str}"
-        partition_dir.mkdir(parents=True, exist_ok=True)
-        partition_df[cols].to_parquet(
-            partition_dir / "tweets.parquet", index=False, compression="snappy"
+def tags_with_fallback(df: pd.DataFrame, col: str, pattern) -> pd.Series:
+    """Scraped CSV list per row; the content regex only runs where that is empty"""
+    if col in df.columns:
+        tags = split_csv_series(df[col])
+    else:
+        tags = pd.Series([[] for _ in range(len(df))], index=df.index, dtype=object)
+    empty = (tags.str.len() == 0).to_numpy()
+    if empty.any():
+        tags[empty] = df["content"][empty].str.findall(pattern)
+    return tags
+
+
+def json_series(s: pd.Series) -> pd.Series:
+    """Each list as the same JSON string the old json.dumps columns held"""
+    return pd.Series([json.dumps(x, ensure_ascii=False) for x in s], index=s.index)
+
+
+def parse_count_series(s: pd.Series) -> pd.Series:
+    """Count column -> int64; understands 1,234 / 1.2K / 3M, anything unparseable is 0"""
+    s = s.astype("string").str.replace(",", "", regex=False).str.strip().str.upper()
+    parts = s.str.extract(COUNT_RE)
+    mult = parts[1].map(COUNT_MULTIPLIERS).fillna(1)
+    num = pd.to_numeric(parts[0], errors="coerce").fillna(0)
+    return (num * mult).round().astype("int64")
+
+
+def drop_duplicates(table: pa.Table, columns: List[str]) -> pa.Table:
+    """Keep the first row for each value of each column in turn (like pandas keep="first")"""
+    for col in columns:
+        if col not in table.column_names:
+            continue
+        first = (
+            pa.table({"key": table[col], "row": np.arange(table.num_rows)})
+            .group_by("key")
+            .aggregate([("row", "min")])
         )
-
-        return date_str, len(partition_df)
-    except Exception as e:
-        print(f"Error processing {date_str}: {e}")
-        return date_str, 0
+        table = table.take(np.sort(first["row_min"].to_numpy()))
+    return table
+
+
+def build_table(df: pd.DataFrame) -> pa.Table:
+    cols = [c for c in OUTPUT_COLUMNS if c in df.columns]
+    table = pa.Table.from_pandas(df[cols], preserve_index=False)
+    # Explicit type so all-empty columns don't come out as list<null>
+    for col in LIST_COLUMNS:
+        i = table.schema.get_field_index(col)
+        table = table.set_column(
+            i, col, pa.array(df[col].tolist(), type=pa.list_(pa.string()))
+        )
+    return table
 
 
 def main():
@@ -103,79 +138,92 @@ def main():
     print("=" * 70)
 
     try:
-        df = pd.read_csv(INPUT_CSV, encoding="utf-8")
+        # Multi-threaded C++ parser straight into Arrow-backed columns. Tweets
+        # contain quoted newlines; text columns (timestamps included, for the ISO
+        # parse below) are pinned to strings rather than inferred.
+        table = pacsv.read_csv(
+            INPUT_CSV,
+            read_options=pacsv.ReadOptions(use_threads=True, block_size=8 << 20),
+            parse_options=pacsv.ParseOptions(newlines_in_values=True),
+            convert_options=pacsv.ConvertOptions(
+                strings_can_be_null=True,
+                column_types={col: pa.string() for col in STRING_COLUMNS},
+            ),
+        )
+        df = table.to_pandas(types_mapper=pd.ArrowDtype)
         print(f"\n[1/6] Loaded {len(df)} rows")
     except FileNotFoundError:
         print(f"ERROR: {INPUT_CSV} not found. Run scraper first.")
         return
 
-    print("[2/6] Normalizing text...")
-    for col in ["content", "username", "handle"]:
-        if col in df.columns:
-            df[col] = df[col].apply(normalize_text)
-
-    print("[3/6] Filtering last 24h...")
-    df["ts_dt"] = df["timestamp_utc"].apply(parse_timestamp)
+    # Window first so normalization and regex work only touch the kept rows
+    print("[2/6] Filtering last 24h...")
+    df["ts_dt"] = pd.to_datetime(
+        df["timestamp_utc"], utc=True, errors="coerce", format="ISO8601", cache=True
+    )
     df = df[df["ts_dt"].notna()]
-    cutoff = datetime.now(timezone.utc) - timedelta(hours=24)
+    cutoff = pd.Timestamp.now(tz="UTC") - pd.Timedelta(hours=24)
     df = df[df["ts_dt"] >= cutoff]
     print(f"    Valid: {len(df)} tweets")
 
-    print("[4/6] Extracting hashtags/mentions...")
-    hashtags = (
-        df["hashtags"].apply(parse_csv_col)
-        if "hashtags" in df.columns
-        else df["content"].apply(extract_hashtags)
-    )
-    mentions = (
-        df["mentions"].apply(parse_csv_col)
-        if "mentions" in df.columns
-        else df["content"].apply(extract_mentions)
-    )
-
-    hashtags = [
-        (h if h else extract_hashtags(c)) for h, c in zip(hashtags, df["content"])
-    ]
-    mentions = [
-        (m if m else extract_mentions(c)) for m, c in zip(mentions, df["content"])
-    ]
+    print("[3/6] Normalizing text...")
+    for col in ["content", "username", "handle"]:
+        if col in df.columns:
+            df[col] = normalize_series(df[col])
 
-    df["hashtags_json"] = [json.dumps(h, ensure_ascii=False) for h in hashtags]
-    df["mentions_json"] = [json.dumps(m, ensure_ascii=False) for m in mentions]
+    print("[4/6] Extracting hashtags/mentions...")
+    # Scraped CSV list first, regex over the content as the fallback
+    hashtags = tags_with_fallback(df, "hashtags", HASHTAG_RE)
+    mentions = tags_with_fallback(df, "mentions", MENTION_RE)
+
+    df["hashtags"] = hashtags
+    df["mentions"] = mentions
+    if LEGACY_JSON:
+        df["hashtags_json"] = json_series(hashtags)
+        df["mentions_json"] = json_series(mentions)
+
+    # Narrow dtypes before the Arrow conversion: a handful of dates as a
+    # category, counts as int32 (what analysis_signal casts them to anyway)
+    df["date"] = df["ts_dt"].dt.strftime("%Y-%m-%d").astype("category")
+    for col in COUNT_COLUMNS:
+        df[col] = parse_count_series(df[col]).astype(COUNT_DTYPE)
 
     print("[5/6] Deduplicating...")
-    df = df.sort_values("ts_dt", ascending=False)
-    initial = len(df)
-    if "tweet_id" in df.columns:
-        df = df.drop_duplicates("tweet_id", keep="first")
-    df = df.drop_duplicates("url", keep="first")
-    print(f"Removed {initial - len(df)} duplicates - {len(df)} unique")
-
-    df["date"] = df["ts_dt"].dt.strftime("%Y-%m-%d")
-
-    print(f"[6/6] Saving to Parquet ({MAX_WORKERS} workers)...")
-    date_groups = list(df.groupby("date"))
-
-    results = []
-    with ProcessPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        futures = {
-            executor.submit(process_partition, date, group): date
-            for date, group in date_groups
-        }
-
-        with tqdm(total=len(date_groups), desc="Partitions") as pbar:
-            for future in as_completed(futures):
-                try:
-                    date, count = future.result()
-                    results.append((date, count))
-                except Exception as e:
-                    print(f"\nError: {e}")
-                pbar.update(1)
+    # Dedup on the Arrow table that gets written: stable sort newest first, then
+    # the first row per tweet_id, then per url among the survivors
+    table = build_table(df)
+    table = table.take(pc.array_sort_indices(pa.array(df["ts_dt"]), order="descending"))
+    initial = table.num_rows
+    table = drop_duplicates(table, ["tweet_id", "url"])
+    print(f"Removed {initial - table.num_rows} duplicates - {table.num_rows} unique")
+
+    print("[6/6] Saving to Parquet...")
+    # One Arrow table, split into date=YYYY-MM-DD directories by the C++ writer
+    # (multi-threaded, no per-partition pickling to worker processes)
+    ds.write_dataset(
+        table,
+        base_dir=OUTPUT_DIR,
+        format="parquet",
+        partitioning=ds.partitioning(pa.schema([("date", pa.string())]), flavor="hive"),
+        basename_template="tweets-{i}.parquet",
+        existing_data_behavior="delete_matching",
+        file_options=ds.ParquetFileFormat().make_write_options(
+            compression="zstd",
+            compression_level=3,
+            use_dictionary=True,
+            data_page_size=1 << 20,
+            write_statistics=True,
+        ),
+        max_rows_per_group=ROW_GROUP_SIZE,
+        use_threads=True,
+    )
+    # astype(str) so dates emptied by the dedup don't show up as 0-count categories
+    results = table["date"].to_pandas().astype(str).value_counts().sort_index()
 
     print(f"\n{'='*70}")
-    print(f"Complete{len(df)} tweets {len(results)} partitions")
+    print(f"Complete{table.num_rows} tweets {len(results)} partitions")
     print(f"Output: {OUTPUT_DIR}")
-    for date, count in sorted(results):
+    for date, count in results.items():
         print(f"  {date}: {count} tweets")
     print("=" * 70)
 
@@ -17,6 +17,49 @@ OUT_CSV = "data/raw/tweets_sample.csv"
 
 QUERY_TEXT = "#nifty50 OR #sensex OR #intraday OR #banknifty"
 
+HASHTAG_RE = re.compile(r"#\w+")
+MENTION_RE = re.compile(r"@\w+")
+COUNT_MULTIPLIERS = {"K": 1000, "M": 1_000_000}
+
+# Article selectors
+SELECTORS = {
+    "article": "article:not([data-processed])",
+    "time": "time",
+    "text": '[data-testid="tweetText"]',
+    "span": "span",
+    "permalink": 'a[href*="/status/"]:has(time)',
+    "statusLink": 'a[href*="/status/"]',
+    "reply": '[data-testid="reply"]',
+    "retweet": '[data-testid="retweet"]',
+    "like": '[data-testid="like"]',
+}
+
+# One round-trip per scroll: read every new article in-page and tag it as
+# processed so the next scroll only fetches new ones. Articles with neither
+# text nor a link are not rendered yet and stay unmarked to be retried.
+EXTRACT_JS = """
+const s = arguments[0];
+const out = [];
+for (const a of document.querySelectorAll(s.article)) {
+    const text = q => (a.querySelector(q)?.innerText || '').trim();
+    const spans = Array.from(a.querySelectorAll(s.span), sp => (sp.innerText || '').trim());
+    const row = {
+        ts: a.querySelector(s.time)?.getAttribute('datetime') || '',
+        content: text(s.text),
+        username: spans[0] || '',
+        handle: spans.find(t => t.startsWith('@')) || '',
+        url: a.querySelector(s.permalink)?.href || a.querySelector(s.statusLink)?.href || '',
+        reply: text(s.reply),
+        retweet: text(s.retweet),
+        like: text(s.like),
+    };
+    if (!row.content && !row.url) continue;
+    a.setAttribute('data-processed', '1');
+    out.push(row);
+}
+return out;
+"""
+
 
 def human_sleep(a=0.8, b=1.6):
     time.sleep(random.uniform(a, b))
@@ -58,69 +101,29 @@ def parse_count(s: str) -> int:
     s = (s or "").replace(",", "").strip()
     if not s:
         return 0
-    mult = 1
-    if s.endswith("K"):
-        mult = 1000
-        s = s[:-1]
-    elif s.endswith("M"):
-        mult = 1_000_000
-        s = s[:-1]
+    mult = COUNT_MULTIPLIERS.get(s[-1], 1)
     try:
-        return int(float(s) * mult)
+        return int(float(s[:-1] if mult > 1 else s) * mult)
     except:
         return 0
 
 
-def safe_find_text(parent, css):
-    try:
-        return parent.find_element(By.CSS_SELECTOR, css).text.strip()
-    except:
-        return ""
-
-
-def safe_find_attr(parent, css, attr):
-    try:
-        return parent.find_element(By.CSS_SELECTOR, css).get_attribute(attr) or ""
-    except:
-        return ""
-
-
-def extract_one_article(article):
-    timestamp_utc = safe_find_attr(article, "time", "datetime")
-    content = safe_find_text(article, '[data-testid="tweetText"]')
-
-    username = ""
-    handle = ""
-    try:
-        spans = article.find_elements(By.CSS_SELECTOR, "span")
-        for sp in spans:
-            txt = (sp.text or "").strip()
-            if txt.startswith("@"):
-                handle = txt
-                break
-        if spans:
-            username = (spans[0].text or "").strip()
-    except:
-        pass
+def extract_one_article(raw):
+    timestamp_utc = raw.get("ts") or ""
+    content = raw.get("content") or ""
+    username = raw.get("username") or ""
+    handle = raw.get("handle") or ""
 
-    tweet_url = ""
-    tweet_id = ""
-    try:
-        for a in article.find_elements(By.CSS_SELECTOR, "a"):
-            href = a.get_attribute("href") or ""
-            if "/status/" in href:
-                tweet_url = href
-                tweet_id = href.split("/status/")[-1].split("?")[0]
-                break
-    except:
-        pass
+    # The timestamp's anchor is the tweet's own permalink; any status link is the fallback
+    tweet_url = raw.get("url") or ""
+    tweet_id = tweet_url.partition("/status/")[2].split("/", 1)[0].split("?", 1)[0]
 
-    reply_count = parse_count(safe_find_text(article, '[data-testid="reply"]'))
-    retweet_count = parse_count(safe_find_text(article, '[data-testid="retweet"]'))
-    like_count = parse_count(safe_find_text(article, '[data-testid="like"]'))
+    reply_count = parse_count(raw.get("reply"))
+    retweet_count = parse_count(raw.get("retweet"))
+    like_count = parse_count(raw.get("like"))
 
-    hashtags = re.findall(r"#\w+", content)
-    mentions = re.findall(r"@\w+", content)
+    hashtags = HASHTAG_RE.findall(content)
+    mentions = MENTION_RE.findall(content)
 
     if not content and not tweet_url:
         return None
@@ -190,9 +193,8 @@ def collect_by_typing(driver, limit=50):
 
     print("Collecting tweets...")
     while len(rows) < limit and scrolls < 120:
-        articles = driver.find_elements(By.CSS_SELECTOR, "article")
-        for art in articles:
-            data = extract_one_article(art)
+        for raw in driver.execute_script(EXTRACT_JS, SELECTORS):
+            data = extract_one_article(raw)
             if not data:
                 continue
             key = data["tweet_id"] or data["url"] or (data["content"] + data["timestamp_utc"])
@@ -1,6 +1,8 @@
+import csv
 import time
 import random
 from datetime import datetime, timezone, timedelta
+from functools import lru_cache
 from pathlib import Path
 
 import pandas as pd
@@ -18,6 +20,9 @@ HASHTAGS = ["nifty50", "sensex", "intraday", "banknifty"]  # PDF hashtags
 TARGET_PER_TAG = 400  # 4*600 = 2400 (you can reduce to 500)
 MAX_SCROLLS_PER_TAG = 1200
 
+COUNT_MULTIPLIERS = {"K": 1000, "M": 1_000_000}
+FIELDNAMES = ["tweet_id", "timestamp_utc", "content", "like_count", "retweet_count", "reply_count", "url"]
+
 
 def log(msg):
     print(msg, flush=True)
@@ -34,9 +39,15 @@ def build_attached_driver():
     return webdriver.Chrome(options=opts)
 
 
+# Checked in-page so only a boolean crosses the wire, not the serialized DOM
+OVERLAY_JS = """
+const t = (document.body?.innerText || '').toLowerCase();
+return (t.includes('something went wrong') && t.includes('try reloading')) || t.includes('try again');
+"""
+
+
 def has_error_overlay(driver) -> bool:
-    src = (driver.page_source or "").lower()
-    return ("something went wrong" in src and "try reloading" in src) or ("try again" in src)
+    return bool(driver.execute_script(OVERLAY_JS))
 
 
 def recover(driver, attempt: int):
@@ -46,6 +57,8 @@ def recover(driver, attempt: int):
     time.sleep(wait_s)
 
 
+# The scan window re-reads the same timestamps every scroll
+@lru_cache(maxsize=8192)
 def parse_ts(ts):
     if not ts:
         return None
@@ -55,69 +68,59 @@ def parse_ts(ts):
         return None
 
 
-def safe_text(parent, css):
-    try:
-        return parent.find_element(By.CSS_SELECTOR, css).text.strip()
-    except Exception:
-        return ""
-
-
-def safe_attr(parent, css, attr):
-    try:
-        return parent.find_element(By.CSS_SELECTOR, css).get_attribute(attr)
-    except Exception:
-        return None
+# One round-trip per scroll: pull every article's fields in-page as plain dicts
+EXTRACT_JS = """
+const all = document.querySelectorAll('article');
+const tweets = Array.from(all, a => {
+    const text = sel => (a.querySelector(sel)?.innerText || '').trim();
+    return {
+        ts: a.querySelector('time')?.dateTime || '',
+        content: text('[data-testid="tweetText"]'),
+        url: a.querySelector('a[href*="/status/"]')?.href || '',
+        like: text('[data-testid="like"]'),
+        retweet: text('[data-testid="retweet"]'),
+        reply: text('[data-testid="reply"]'),
+    };
+});
+return {count: all.length, tweets: tweets};
+"""
 
 
 def parse_count(s: str) -> int:
     s = (s or "").replace(",", "").strip()
     if not s:
         return 0
-    mult = 1
-    if s.endswith("K"):
-        mult = 1000
-        s = s[:-1]
-    elif s.endswith("M"):
-        mult = 1_000_000
-        s = s[:-1]
+    mult = COUNT_MULTIPLIERS.get(s[-1], 1)
     try:
-        return int(float(s) * mult)
+        return int(float(s[:-1] if mult > 1 else s) * mult)
     except Exception:
         return 0
 
 
-def extract(article):
-    ts_raw = safe_attr(article, "time", "datetime")
+def extract(raw, cutoff):
+    ts_raw = raw.get("ts")
     ts = parse_ts(ts_raw)
     if not ts:
         return None
 
     # last 24 hours only
-    if ts < datetime.now(timezone.utc) - timedelta(hours=24):
+    if ts < cutoff:
         return "OLD"
 
-    content = safe_text(article, '[data-testid="tweetText"]')
+    content = raw.get("content") or ""
     if not content:
         return None
 
-    url, tid = "", ""
-    try:
-        for a in article.find_elements(By.CSS_SELECTOR, "a"):
-            h = a.get_attribute("href") or ""
-            if "/status/" in h:
-                url = h
-                tid = h.split("/status/")[-1].split("?")[0]
-                break
-    except Exception:
-        pass
+    url = raw.get("url") or ""
+    tid = url.split("/status/")[-1].split("?")[0] if url else ""
 
     return {
         "tweet_id": tid,
         "timestamp_utc": ts_raw,
         "content": content,
-        "like_count": parse_count(safe_text(article, '[data-testid="like"]')),
-        "retweet_count": parse_count(safe_text(article, '[data-testid="retweet"]')),
-        "reply_count": parse_count(safe_text(article, '[data-testid="reply"]')),
+        "like_count": parse_count(raw.get("like")),
+        "retweet_count": parse_count(raw.get("retweet")),
+        "reply_count": parse_count(raw.get("reply")),
         "url": url,
     }
 
@@ -132,13 +135,19 @@ def wait_for_more_articles(driver, prev_count, timeout=12):
     return False
 
 
-def collect_for_hashtag(driver, tag: str, target: int):
+def collect_for_hashtag(driver, tag: str, target: int, cutoff: datetime, out=None):
     """
     Collect tweets for one hashtag from Live feed.
     Auto-recovers on X overlay errors.
     Stops when older tweets dominate or target reached.
+    Tweets older than `cutoff` count as old hits.
+    New rows are also streamed as CSV to the open file `out` as they arrive.
     """
     rows, seen = [], set()
+    writer = None
+    if out is not None:
+        writer = csv.DictWriter(out, fieldnames=FIELDNAMES)
+        writer.writeheader()
 
     q = f"%23{tag}"
     url = f"https://x.com/search?q={q}&src=typed_query&f=live"
@@ -164,11 +173,11 @@ def collect_for_hashtag(driver, tag: str, target: int):
         else:
             recover_attempts = 0
 
-        articles = driver.find_elements(By.CSS_SELECTOR, "article")
+        batch = driver.execute_script(EXTRACT_JS)
         new_this_round = 0
 
-        for art in articles:
-            data = extract(art)
+        for raw in batch["tweets"]:
+            data = extract(raw, cutoff)
 
             if data == "OLD":
                 old_hits += 1
@@ -183,6 +192,8 @@ def collect_for_hashtag(driver, tag: str, target: int):
 
             seen.add(key)
             rows.append(data)
+            if writer is not None:
+                writer.writerow(data)
             new_this_round += 1
 
             if len(rows) % 100 == 0:
@@ -196,7 +207,10 @@ def collect_for_hashtag(driver, tag: str, target: int):
             log(f"[STOP] #{tag}: reached older tweets frequently (24h boundary).")
             break
 
-        prev_count = len(articles)
+        if out is not None and new_this_round:
+            out.flush()
+
+        prev_count = batch["count"]
         driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
 
         loaded_more = wait_for_more_articles(driver, prev_count, timeout=12)
@@ -220,14 +234,15 @@ def collect_for_hashtag(driver, tag: str, target: int):
 def main():
     driver = build_attached_driver()
     all_rows = []
+    # One 24h window for the whole run, shared by the scroll loop and the final filter
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=24)
 
     try:
         for tag in HASHTAGS:
-            rows = collect_for_hashtag(driver, tag, TARGET_PER_TAG)
-
-            # Save per-hashtag for safety/debug
+            # Per-hashtag file for safety/debug, appended row by row while scrolling
             out_csv = OUT_DIR / f"tweets_{tag}.csv"
-            pd.DataFrame(rows).to_csv(out_csv, index=False, encoding="utf-8")
+            with open(out_csv, "w", newline="", encoding="utf-8") as f:
+                rows = collect_for_hashtag(driver, tag, TARGET_PER_TAG, cutoff, f)
             log(f"Saved per-tag file: {out_csv}")
 
             all_rows.extend(rows)
@@ -249,11 +264,10 @@ def main():
         df = df.drop_duplicates(subset=["tweet_id"], keep="first")
     df = df.drop_duplicates(subset=["url"], keep="first")
 
-    # last-24h final filter (safety)
-    df["ts_dt"] = pd.to_datetime(df["timestamp_utc"], utc=True, errors="coerce")
-    df = df[df["ts_dt"].notna()]
-    df = df[df["ts_dt"] >= datetime.now(timezone.utc) - timedelta(hours=24)]
-    df = df.drop(columns=["ts_dt"])
+    # last-24h final filter (safety); <time datetime> is always ISO-8601 UTC
+    # ("2024-01-31T09:15:00.000Z"), so plain string order is time order
+    cutoff_iso = cutoff.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+    df = df[df["timestamp_utc"] >= cutoff_iso]
 
     df.to_csv(MERGED_CSV, index=False, encoding="utf-8")
     log(f"\nMerged final count: {len(df)} tweets")